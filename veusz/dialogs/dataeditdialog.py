@@ -22,6 +22,8 @@
 
 from __future__ import division
 
+import re
+
 import numpy as N
 
 from ..compat import cstr
@@ -36,6 +38,23 @@ def _(text, disambiguation=None, context="DataEditDialog"):
     """Translate text."""
     return qt4.QCoreApplication.translate(context, text, disambiguation)
 
+def makeCopyName(name, existing):
+    """Get a name for a copy of dataset name not clashing with existing.
+
+    The highest index of any existing copy is found in a single pass,
+    rather than probing candidate names one index at a time."""
+
+    newname = name + '_copy'
+    if newname not in existing:
+        return newname
+    copyre = re.compile(re.escape(name) + r'_copy_(\d+)$')
+    maxindex = 1
+    for n in existing:
+        m = copyre.match(n)
+        if m:
+            maxindex = max(maxindex, int(m.group(1)))
+    return '%s_copy_%i' % (name, maxindex+1)
+
 class DatasetTableModel1D(qt4.QAbstractTableModel):
     """Provides access to editing and viewing of datasets."""
 
@@ -44,9 +63,26 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
 
         self.document = document
         self.dsname = datasetname
+        self.updateCache()
+
+        # edits waiting to be applied as a single operation
+        self._pendingedits = []
 
         document.signalModified.connect(self.slotDocumentModified)
 
+    def updateCache(self):
+        """Cache dataset and column arrays.
+
+        data() is called by Qt for every visible cell, so avoid
+        looking these up per cell."""
+        ds = self.document.data.get(self.dsname)
+        if ds is not None and hasattr(ds, 'columns'):
+            self._dscache = ds
+            self._colcache = [getattr(ds, c) for c in ds.columns]
+        else:
+            self._dscache = None
+            self._colcache = []
+
     def rowCount(self, parent):
         """Return number of rows."""
         if parent.isValid():
@@ -54,41 +90,37 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
             return 0
 
         try:
-            return len(self.document.data[self.dsname].data)+1
-        except (KeyError, AttributeError):
+            return len(self._colcache[0])+1
+        except (IndexError, TypeError):
             return 0
 
     def slotDocumentModified(self):
         """Called when document modified."""
+        self.updateCache()
         self.layoutChanged.emit()
 
     def columnCount(self, parent):
         """Return number of columns."""
 
-        if parent.isValid():
+        if parent.isValid() or self._dscache is None:
             return 0
-        try:
-            ds = self.document.data[self.dsname]
-        except KeyError:
-            return 0
-        return len( ds.column_descriptions )
+        return len( self._dscache.column_descriptions )
 
     def data(self, index, role):
         """Return data for index."""
-        # get dataset
-        ds = self.document.data[self.dsname]
-        if ds is not None:
-            # select correct part of dataset
-            data = getattr(ds, ds.columns[index.column()])
-        if ds is not None and data is not None and role in (
+        ds = self._dscache
+        if ds is not None and role in (
             qt4.Qt.DisplayRole, qt4.Qt.EditRole):
-            # blank row at end of data
-            if index.row() == len(data):
-                return None
+            # select correct part of dataset
+            data = self._colcache[index.column()]
+            if data is not None:
+                # blank row at end of data
+                if index.row() == len(data):
+                    return None
 
-            # convert data to data
-            d = data[index.row()]
-            return ds.uiDataItemToData(d)
+                # convert data to data
+                d = data[index.row()]
+                return ds.uiDataItemToData(d)
 
         # empty entry
         return None
@@ -96,9 +128,8 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
     def headerData(self, section, orientation, role):
         """Return row numbers or column names."""
 
-        try:
-            ds = self.document.data[self.dsname]
-        except KeyError:
+        ds = self._dscache
+        if ds is None:
             return None
 
         if role == qt4.Qt.DisplayRole:
@@ -117,7 +148,7 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
         """Update flags to say that items are editable."""
         if index.isValid():
             f = qt4.QAbstractTableModel.flags(self, index)
-            ds = self.document.data.get(self.dsname)
+            ds = self._dscache
             if ds is not None and ds.editable:
                 f |= qt4.Qt.ItemIsEditable
             return f
@@ -139,22 +170,9 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
         if not index.isValid() or role != qt4.Qt.EditRole:
             return False
 
-        row = index.row()
-        column = index.column()
-        ds = self.document.data[self.dsname]
-        data = getattr(ds, ds.columns[index.column()])
-
-        # add new column if necessary
-        ops = document.OperationMultiple([], descr=_('set value'))
-        if data is None:
-            ops.addOperation(
-                document.OperationDatasetAddColumn(self.dsname,
-                                                   ds.columns[column]))
-
-        # add a row if necessary
-        if row == len(ds.data):
-            ops.addOperation(
-                document.OperationDatasetInsertRow(self.dsname, row, 1))
+        ds = self._dscache
+        if ds is None:
+            return False
 
         # update if conversion okay
         try:
@@ -162,15 +180,57 @@ class DatasetTableModel1D(qt4.QAbstractTableModel):
         except ValueError:
             return False
 
-        ops.addOperation(
-            document.OperationDatasetSetVal(self.dsname,
-                                            ds.columns[column],
-                                            row, val))
+        # queue the edit: edits arriving in the same event loop
+        # iteration (e.g. pasting a block of values) are applied as a
+        # single operation, giving one undo step and one document
+        # update instead of one per cell
+        self._pendingedits.append( (index.row(), index.column(), val) )
+        if len(self._pendingedits) == 1:
+            qt4.QTimer.singleShot(0, self._flushEdits)
+        return True
+
+    def _flushEdits(self):
+        """Apply queued edits as a single operation."""
+
+        edits = self._pendingedits
+        self._pendingedits = []
+        ds = self._dscache
+        if not edits or ds is None:
+            return
+
+        ops = document.OperationMultiple([], descr=_('set value'))
+        length = len(ds.data)
+        newcolumns = set()
+        batches = {}
+        for row, column, val in edits:
+            colname = ds.columns[column]
+
+            # add new column if necessary
+            if self._colcache[column] is None and colname not in newcolumns:
+                newcolumns.add(colname)
+                ops.addOperation(
+                    document.OperationDatasetAddColumn(self.dsname, colname))
+
+            # add rows if necessary
+            if row >= length:
+                ops.addOperation(
+                    document.OperationDatasetInsertRow(
+                        self.dsname, length, row+1-length))
+                length = row+1
+
+            rows, vals = batches.setdefault(colname, ([], []))
+            rows.append(row)
+            vals.append(val)
+
+        # one batched set operation per column edited
+        for colname, (rows, vals) in sorted(batches.items()):
+            ops.addOperation(
+                document.OperationDatasetSetValBatch(
+                    self.dsname, colname, rows, vals))
         try:
             self.document.applyOperation(ops)
         except RuntimeError:
-            return False
-        return True
+            pass
 
 class DatasetTableModelMulti(qt4.QAbstractTableModel):
     """Edit multiple datasets simultaneously with a spreadsheet-like style."""
@@ -342,54 +402,61 @@ class DatasetTableModel2D(qt4.QAbstractTableModel):
 
         self.document = document
         self.dsname = datasetname
+        self.updateCache()
         self.updatePixelCoords()
         document.signalModified.connect(self.slotDocumentModified)
 
+    def updateCache(self):
+        """Cache a y-flipped view of the data.
+
+        This avoids re-resolving the dataset and reversing the row
+        index for every cell Qt requests (y is reversed as high y is
+        at the top). The view is a stride trick, not a copy."""
+        self._flipped = None
+        ds = self.document.data.get(self.dsname)
+        if ds is not None and ds.dimensions == 2:
+            data = ds.data
+            if data is not None and data.ndim == 2:
+                self._flipped = data[::-1]
+
     def updatePixelCoords(self):
         """Get coordinates at edge of grid."""
         self.xedge = self.yedge = self.xcent = self.ycent = []
+        self._xheaders = self._yheaders = None
         ds = self.document.data.get(self.dsname)
         if ds and ds.dimensions==2:
             self.xcent, self.ycent = ds.getPixelCentres()
             self.xedge, self.yedge = ds.getPixelEdges()
 
+    def _ensureHeaders(self):
+        """Format header labels once, not on every header paint."""
+        if self._xheaders is not None:
+            return
+        ny = len(self.ycent)
+        self._xheaders = [
+            '%i (%s)' % (ny-i, setting.ui_floattostring(v, maxdp=4))
+            for i, v in enumerate(self.xcent) ]
+        self._yheaders = [
+            '%i (%s)' % (ny-i, setting.ui_floattostring(self.ycent[ny-i-1],
+                                                        maxdp=4))
+            for i in range(ny) ]
+
     def rowCount(self, parent):
-        if parent.isValid():
-            return 0
-        try:
-            data = self.document.data[self.dsname].data
-        except KeyError:
-            return 0
-        if data is not None and data.ndim==2:
-            return data.shape[0]
-        else:
+        if parent.isValid() or self._flipped is None:
             return 0
+        return self._flipped.shape[0]
 
     def columnCount(self, parent):
-        if parent.isValid():
-            return 0
-        try:
-            data = self.document.data[self.dsname].data
-        except KeyError:
-            return 0
-        if data is not None and data.ndim==2:
-            return data.shape[1]
-        else:
+        if parent.isValid() or self._flipped is None:
             return 0
+        return self._flipped.shape[1]
 
     def data(self, index, role):
-        if role == qt4.Qt.DisplayRole:
-            # get data (note y is reversed, sigh)
+        if role == qt4.Qt.DisplayRole and self._flipped is not None:
             try:
-                data = self.document.data[self.dsname].data
-            except KeyError:
-                return None
-            if data is not None and data.ndim==2:
-                try:
-                    num = data[data.shape[0]-index.row()-1, index.column()]
-                    return float(num)
-                except IndexError:
-                    pass
+                return float(self._flipped[index.row(), index.column()])
+            except IndexError:
+                pass
 
         return None
 
@@ -397,17 +464,18 @@ class DatasetTableModel2D(qt4.QAbstractTableModel):
         """Return headers at top."""
 
         ds = self.document.data.get(self.dsname)
-        if ds.dimensions != 2:
+        if ds is None or ds.dimensions != 2:
             return None
 
         xaxis = orientation == qt4.Qt.Horizontal
 
         # note: y coordinates are upside down (high y is at top)
-        if ds is not None and role == qt4.Qt.DisplayRole:
-            v = self.xcent[section] if xaxis else self.ycent[
-                len(self.ycent)-section-1]
-            return '%i (%s)' % (
-                len(self.ycent)-section, setting.ui_floattostring(v, maxdp=4))
+        if role == qt4.Qt.DisplayRole:
+            self._ensureHeaders()
+            try:
+                return (self._xheaders if xaxis else self._yheaders)[section]
+            except IndexError:
+                return None
 
         elif ds is not None and role == qt4.Qt.ToolTipRole:
             v1 = self.xedge[section] if xaxis else self.yedge[
@@ -432,6 +500,7 @@ class DatasetTableModel2D(qt4.QAbstractTableModel):
 
     def slotDocumentModified(self):
         """Called when document modified."""
+        self.updateCache()
         self.updatePixelCoords()
         self.layoutChanged.emit()
 
@@ -574,6 +643,12 @@ class DataEditDialog(VeuszDialog):
         self.linkedlabel.setFrameShape(qt4.QFrame.NoFrame)
         self.linkedlabel.viewport().setBackgroundRole(qt4.QPalette.Window)
 
+        # timer to coalesce rapid-fire document modifications into a
+        # single update of the unlink/linked-information widgets
+        self.unlinktimer = qt4.QTimer(self)
+        self.unlinktimer.setSingleShot(True)
+        self.unlinktimer.timeout.connect(self.setUnlinkState)
+
         # document changes
         document.signalModified.connect(self.slotDocumentModified)
 
@@ -654,7 +729,7 @@ class DataEditDialog(VeuszDialog):
 
     def slotDocumentModified(self):
         """Set unlink status when document modified."""
-        self.setUnlinkState()
+        self.unlinktimer.start(0)
 
     def selectDataset(self, dsname):
         """Select dataset with name given."""
@@ -687,11 +762,7 @@ class DataEditDialog(VeuszDialog):
         ops = []
         for name in self.dsbrowser.navtree.getSelectedDatasets():
             # generate new name for dataset
-            newname = name + '_copy'
-            index = 2
-            while newname in self.document.data:
-                newname = '%s_copy_%i' % (name, index)
-                index += 1
+            newname = makeCopyName(name, self.document.data)
             ops.append(
                 document.OperationDatasetDuplicate(name, newname))
         if ops:
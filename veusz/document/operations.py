@@ -1015,6 +1015,39 @@ class OperationDatasetSetVal(Operation):
         datacol[self.row] = self.oldval
         ds.changeValues(self.columnname, datacol)
 
+class OperationDatasetSetValBatch(Operation):
+    """Set a batch of values in one column of a dataset.
+
+    This is used instead of many OperationDatasetSetVal operations so
+    that the column is updated, and the document notified, only once.
+    """
+
+    descr = _('change dataset values')
+
+    def __init__(self, datasetname, columnname, rows, vals):
+        """Set rows in column columnname to vals."""
+        self.datasetname = datasetname
+        self.columnname = columnname
+        self.rows = rows
+        self.vals = vals
+
+    def do(self, document):
+        """Set the values."""
+        ds = document.data[self.datasetname]
+        datacol = getattr(ds, self.columnname)
+        self.oldvals = [datacol[row] for row in self.rows]
+        for row, val in czip(self.rows, self.vals):
+            datacol[row] = val
+        ds.changeValues(self.columnname, datacol)
+
+    def undo(self, document):
+        """Restore the values."""
+        ds = document.data[self.datasetname]
+        datacol = getattr(ds, self.columnname)
+        for row, val in czip(self.rows, self.oldvals):
+            datacol[row] = val
+        ds.changeValues(self.columnname, datacol)
+
 class OperationDatasetSetVal2D(Operation):
     """Set a value in a 2D dataset."""
 
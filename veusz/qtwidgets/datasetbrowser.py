@@ -24,7 +24,7 @@ import os.path
 import numpy as N
 import textwrap
 
-from ..compat import crange, citems, czip, cbasestr, cstr
+from ..compat import crange, czip, cbasestr, cstr
 from .. import qtall as qt4
 from .. import setting
 from .. import document
@@ -188,8 +188,8 @@ class FilenameNode(TMNode):
 def treeFromList(nodelist, rootdata):
     """Construct a tree from a list of nodes."""
     tree = TMNode( rootdata, None )
-    for node in nodelist:
-        tree.insertChildSorted(node)
+    for node in sorted(nodelist, key=lambda n: n.data):
+        tree.appendChild(node)
     return tree
 
 class DatasetRelationModel(TreeModel):
@@ -257,12 +257,14 @@ class DatasetRelationModel(TreeModel):
             cols += [_('check')]
 
         tree = TMNode(heads , None)
-        for name, ds in citems(self.doc.data):
+        # iterate in sorted order so children can simply be appended
+        for name in sorted(self.doc.data):
+            ds = self.doc.data[name]
             child = DatasetNode(self, name, cols, None)
 
             # add if not filtered for filtering
             if not self.datasetFilterOut(ds, child):
-                tree.insertChildSorted(child)
+                tree.appendChild(child)
         return tree
 
     def makeGrpTree(self, coltitles, colitems, grouper, GrpNodeClass):
@@ -278,7 +280,9 @@ class DatasetRelationModel(TreeModel):
             colitems = colitems + [_('check')]
 
         grpnodes = {}
-        for name, ds in citems(self.doc.data):
+        # iterate in sorted order so children can simply be appended
+        for name in sorted(self.doc.data):
+            ds = self.doc.data[name]
             child = DatasetNode(self, name, colitems, None)
 
             # check whether filtered out
@@ -289,7 +293,7 @@ class DatasetRelationModel(TreeModel):
                     if grp not in grpnodes:
                         grpnodes[grp] = GrpNodeClass( (grp,), None )
                     # add to group
-                    grpnodes[grp].insertChildSorted(child)
+                    grpnodes[grp].appendChild(child)
 
         return treeFromList(list(grpnodes.values()), coltitles)
 
@@ -426,7 +430,7 @@ class DatasetsNavigatorTree(qt4.QTreeView):
         self.setContextMenuPolicy(qt4.Qt.CustomContextMenu)
         if not readonly:
             self.customContextMenuRequested.connect(self.showContextMenu)
-        self.model.refresh()
+        # model constructor has already built the tree of datasets
         self.expandAll()
 
         # stretch of columns
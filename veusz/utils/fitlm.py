@@ -45,7 +45,7 @@ def fitLM(func, params, xvals, yvals, errors,
     params is a numpy of parameters to fit for. These are passed to
     the function.
 
-    xvals are x data points (numpy), yvals are the y data points (numarray)
+    xvals are x data points (numpy), yvals are the y data points (numpy)
     errors are a numpy of errors on the y data points.
     Set all to 1 if not important.
 
@@ -72,6 +72,15 @@ class TMNode(object):
         newchild.parent = self
         self.childnodes.insert(idx, newchild)
 
+    def appendChild(self, newchild):
+        """Append child node.
+
+        The caller is responsible for keeping children sorted (this
+        avoids the O(N) scan of insertChildSorted when building a tree
+        from an already-sorted set of nodes)."""
+        newchild.parent = self
+        self.childnodes.append(newchild)
+
     def cloneTo(self, newroot):
         """Make a clone of self at the root given."""
         return self.__class__(self.data, newroot)